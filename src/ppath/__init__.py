@@ -16,14 +16,21 @@ __all__ = (
 )
 
 import collections
+import concurrent.futures
 import contextlib
+import ctypes
 import enum
+import errno
+import functools
 import grp
 import hashlib
+import mmap
 import os
 import pathlib
 import platform
 import pwd
+import re
+import shlex
 import shutil
 import signal
 import stat
@@ -31,6 +38,7 @@ import subprocess
 import sys
 import tempfile
 import tokenize
+import zlib
 from io import BufferedRandom
 from io import BufferedReader
 from io import BufferedWriter
@@ -47,7 +55,34 @@ from typing import IO
 from typing import Union
 
 _cache_passwd = {}
-_cache_which = {}
+
+_CMP_BLOCK_SIZE = 1048576
+"""Block size to compare files in :func:`ppath.Path.cmp`."""
+_CMP_BYTES_SIZE = 65536
+"""Files smaller than this are compared byte by byte in :func:`ppath.Path.cmp` instead of hashed."""
+_CHMOD_PERM = {"r": 0o444, "w": 0o222, "x": 0o111, "s": stat.S_ISUID | stat.S_ISGID, "t": stat.S_ISVTX}
+_CHMOD_WHO = {
+    "a": 0o7777,
+    "g": stat.S_ISGID | stat.S_IRWXG,
+    "o": stat.S_ISVTX | stat.S_IRWXO,
+    "u": stat.S_ISUID | stat.S_IRWXU,
+}
+_SETID = {
+    True: ("u+s,+x", stat.S_ISUID | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH),
+    False: ("g+s,+x", stat.S_ISGID | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH),
+}
+"""chmod mode and mode bits to check by uid argument of :func:`ppath.Path.setid`."""
+_SHELL_BUILTINS = frozenset((
+    ".", ":", "alias", "bg", "break", "cd", "command", "continue", "eval", "exec", "exit", "export", "fg",
+    "getopts", "hash", "jobs", "let", "local", "read", "readonly", "return", "set", "shift", "source", "times",
+    "trap", "type", "ulimit", "umask", "unalias", "unset", "wait",
+))
+"""Shell builtins that :func:`ppath.which` returns without starting a shell."""
+_STAT_IGNORED_ERRNOS = (errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP)
+"""Errors treated as a missing path by :func:`_stat_or_none`, as :func:`pathlib.Path.exists` does."""
+_STAT_SGID = stat.S_ISGID | stat.S_IXGRP
+_STAT_STICKY = stat.S_ISVTX
+_STAT_SUID = stat.S_ISUID | stat.S_IXUSR
 
 AnyPath = Union[os.PathLike, AnyStr, IO[AnyStr]]
 MACOS = platform.system() == "Darwin"
@@ -192,16 +227,24 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             ...     t('1/2/3/4/5/6/7.py/8/9.py', file=PIs.IS_FILE) # doctest: +IGNORE_EXCEPTION_DETAIL, +ELLIPSIS
             Traceback (most recent call last):
             NotADirectoryError
+            >>> with Path.tempdir() as t:
+            ...     assert t('1.py', file='is_file').is_file() is True
 
         Args:
             name: path to add.
-            file: file or directory.
+            file: file or directory, :class:`ppath.PIs` member or its value.
             passwd: user.
             mode: mode.
 
+        Raises:
+            ValueError: if file is not a :class:`ppath.PIs` value.
+
         Returns:
             Path.
         """
+        if file.__class__ is not PIs:
+            # A value would otherwise fail the identity checks and always make a dir.
+            file = PIs(file)
         # noinspection PyArgumentList
         return (self.mkdir if file is PIs.IS_DIR or file is PIs.EXISTS else self.touch)(
             name=name, passwd=passwd, mode=mode, effective_ids=effective_ids, follow_symlinks=follow_symlinks,
@@ -227,22 +270,34 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             bool
         """
-        value = self.__class__(value) if isinstance(value, str) and "/" in value else toiter(value)
-        return all([item in self.resolve().parts for item in value])
+        if isinstance(value, str):
+            value = _split(value)
+        else:
+            value = toiter(value)
+        return self._resolved_parts_set.issuperset(value)
 
     def __eq__(self, other):
         """
-        Equal based on _cparts
+        Equal based on str, since posix paths are not case folded (same as _cparts).
 
         Examples:
             >>> assert Path('/usr/local') == Path('/usr/local')
+            >>> assert Path('/usr/local') != Path('/usr/Local')
+            >>> assert Path('/usr//local/') == Path('/usr/local')
         """
         if not isinstance(other, self.__class__):
             return NotImplemented
-        return self._cparts == other._cparts
+        try:
+            return self._str == other._str
+        except AttributeError:
+            return str(self) == str(other)
 
     def __hash__(self):
-        return self._hash if hasattr(self, '_hash') else hash(tuple(self._cparts))
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(str(self))
+            return self._hash
 
     def __iter__(self):
         """
@@ -276,6 +331,26 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             return NotImplemented
         return self._cparts >= other._cparts
 
+    @property
+    def _parts_set(self):
+        # Cached set of parts, for containment checks
+        try:
+            return self._cached_parts_set
+        except AttributeError:
+            self._cached_parts_set = frozenset(self.parts)
+            return self._cached_parts_set
+
+    @property
+    def _resolved_parts_set(self):
+        # Cached set of resolved parts for absolute paths, for __contains__ (relative paths depend on cwd)
+        try:
+            return self._cached_resolved_parts_set
+        except AttributeError:
+            rv = self.resolve()._parts_set
+            if self.is_absolute():
+                self._cached_resolved_parts_set = rv
+            return rv
+
     def access(self, os_mode=os.W_OK, *, dir_fd=None, effective_ids=False, follow_symlinks=False):
         # noinspection LongLine
         """
@@ -356,14 +431,9 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             Compose path.
         """
-        # print(self.is_file())
-        if exception and self.is_file() and args:
+        if exception and args and self.is_file():
             raise FileNotFoundError(f'parts: {args}, can not be added since path is file or not directory: {self}')
-        args = toiter(args)
-        path = self
-        for arg in args:
-            path = path / arg
-        return path
+        return self.joinpath(*toiter(args)) if args else self
 
     def append_text(self, text, encoding=None, errors=None):
         """
@@ -384,9 +454,64 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         """
         if not isinstance(text, str):
             raise TypeError(f'data must be str, not {text.__class__.__name__}')
-        with self.open(mode='a', encoding=encoding, errors=errors) as f:
+        with self.open(mode='a+', encoding=encoding, errors=errors) as f:
             f.write(text)
-        return self.read_text()
+            f.seek(0)
+            return f.read()
+
+    @classmethod
+    @contextlib.contextmanager
+    def batch(cls, sudo=True):
+        """
+        Queue commands and run them with :func:`ppath.Path.batch_exec` on exit, if no exception is raised.
+
+        Examples:
+            >>> with Path.tempdir() as tmp:
+            ...     file = tmp.touch("file")
+            ...     with Path.batch(sudo=False) as commands:
+            ...         commands.append(file.cp_cmd(tmp / "copy"))
+            ...         commands.append(file.rm_cmd())
+            ...     assert not file.exists() and (tmp / "copy").is_file()
+
+        Args:
+            sudo: run with sudo if installed and user is not root (default: True).
+
+        Raises:
+            CalledProcessError: if any command fails.
+
+        Returns:
+            List to append commands to.
+        """
+        commands = []
+        yield commands
+        if commands:
+            cls.batch_exec(*commands, sudo=sudo)
+
+    @classmethod
+    def batch_exec(cls, *commands, sudo=True):
+        """
+        Run commands joined with `&&` in a single `sudo sh -c`, one fork and sudo authentication for all.
+
+        Commands can be built with :func:`ppath.Path.chmod_cmd`, :func:`ppath.Path.chown_cmd`,
+        :func:`ppath.Path.cp_cmd` and :func:`ppath.Path.rm_cmd`.
+
+        Examples:
+            >>> with Path.tempdir() as tmp:
+            ...     file = tmp.touch("file")
+            ...     _ = Path.batch_exec(file.chmod_cmd(600), file.cp_cmd(tmp / "copy"), sudo=False)
+            ...     assert (tmp / "copy").stats().mode == "-rw-------"
+
+        Args:
+            *commands: commands as lists of arguments.
+            sudo: run with sudo if installed and user is not root (default: True).
+
+        Raises:
+            CalledProcessError: if any command fails.
+
+        Returns:
+            :class:`subprocess.CompletedProcess`.
+        """
+        return _sh([rv] if sudo and (rv := which()) and os.geteuid() != 0 else [], *commands, check=True)
 
     @contextlib.contextmanager
     def cd(self):
@@ -404,12 +529,13 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             Old Pwd Path.
         """
-        oldpwd = self.cwd()
+        oldpwd = os.getcwd()
         try:
             self.chdir()
-            yield oldpwd
+            yield self.__class__(oldpwd)
         finally:
-            oldpwd.chdir()
+            # Known directory: no need to check for it in to_parent().
+            os.chdir(oldpwd)
 
     def chdir(self):
         """
@@ -437,7 +563,7 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         os.chdir(path)
         return path
 
-    def checksum(self, algorithm='sha256', block_size=65536):
+    def checksum(self, algorithm='sha256', block_size=1048576):
         """
         Calculate the checksum of a file.
 
@@ -445,18 +571,73 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             >>> with Path.tempfile() as tmp:
             ...    _ = tmp.path.write_text('Hello')
             ...    assert tmp.path.checksum() == '185f8db32271fe25f561a6fc938b2e264306ec304eda518007d1764826381969'
+            ...    assert tmp.path.checksum('crc32') == 'f7d18982'
+
+        Uses :func:`hashlib.file_digest` (Python 3.11+, hashes in C without the GIL), otherwise the file
+        is mapped in memory with :mod:`mmap` and hashed with a single update. Sequential access is advised
+        to the kernel where supported.
+
+        Args:
+            algorithm: hash algorithm, :mod:`hashlib` name or 'crc32' (:func:`zlib.crc32`) (default: 'sha256').
+            block_size: block size when the file can not be mapped in memory, ignored on Python 3.11+ where
+                :func:`hashlib.file_digest` uses its own buffer (default: 1 MiB).
+
+        Returns:
+            Checksum of file.
+        """
+        with self.open('rb') as f:
+            if hasattr(os, "posix_fadvise"):
+                # Larger kernel readahead, so disk reads overlap with hashing.
+                with contextlib.suppress(OSError):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if algorithm == "crc32":
+                algorithm = _Crc32
+            elif algorithm == "sha256":
+                # Direct constructor for the default, no lookup by name.
+                algorithm = hashlib.sha256
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            sha = algorithm() if callable(algorithm) else hashlib.new(algorithm)
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    sha.update(m)
+            except (OSError, ValueError):
+                buffer = bytearray(block_size)
+                view = memoryview(buffer)
+                readinto, update = f.readinto, sha.update
+                while size := readinto(buffer):
+                    update(view[:size])
+        return sha.hexdigest()
+
+    def checksum_mmap(self, algorithm='sha256'):
+        """
+        Calculate the checksum of a file mapped in memory with :mod:`mmap`, hashed with a single update.
+
+        For files that fit comfortably in memory, hands the hash a single contiguous buffer. Falls back to
+        :func:`ppath.Path.checksum` if the file can not be mapped (i.e.: empty file, pipe).
+
+        Examples:
+            >>> with Path.tempfile() as tmp:
+            ...    assert tmp.path.checksum_mmap() == tmp.path.checksum()
+            ...    _ = tmp.path.write_text('Hello')
+            ...    assert tmp.path.checksum_mmap() == tmp.path.checksum()
+            ...    assert tmp.path.checksum_mmap('crc32') == 'f7d18982'
 
         Args:
-            algorithm: hash algorithm (default: 'sha256').
-            block_size: block size (default: 65536).
+            algorithm: hash algorithm, :mod:`hashlib` name or 'crc32' (:func:`zlib.crc32`) (default: 'sha256').
 
         Returns:
             Checksum of file.
         """
-        sha = hashlib.new(algorithm)
         with self.open('rb') as f:
-            for block in iter(lambda: f.read(block_size), b''):
-                sha.update(block)
+            try:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return self.checksum(algorithm=algorithm)
+            with m:
+                sha = hashlib.sha256() if algorithm == "sha256" else \
+                    _Crc32() if algorithm == "crc32" else hashlib.new(algorithm)
+                sha.update(m)
         return sha.hexdigest()
 
     def chmod(self, mode=None, effective_ids=False, exception=True, follow_symlinks=False, recursive=False):
@@ -488,19 +669,49 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             Path with changed mode.
         """
-        if exception and not self.exists():
-            raise FileNotFoundError(f'path does not exist: {self}')
+        # One stat for existence and type (second lstat only if missing, for broken links).
+        if (st_type := _stat_type(self)) is None and not self.is_symlink():
+            if exception:
+                raise FileNotFoundError(f'path does not exist: {self}')
+            return self
+        is_dir = st_type == stat.S_IFDIR
 
-        subprocess.run([
-            *self.sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
-            f'{self.chmod.__name__}',
-            *(["-R"] if recursive and self.is_dir() else []),
-            str(mode or (755 if self.is_dir() else 644)),
-            self.resolve() if follow_symlinks else self
-        ], capture_output=True)
+        mode = str(mode or (755 if is_dir else 644))
+        path = self.resolve() if follow_symlinks else self
+        try:
+            _chmod(path, mode, recursive=recursive)
+        except (OSError, ValueError):
+            subprocess.run([
+                *self.sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                *self.chmod_cmd(mode=mode, follow_symlinks=follow_symlinks, recursive=recursive),
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
         return self
 
+    def chmod_cmd(self, mode=None, follow_symlinks=False, recursive=False):
+        """
+        `chmod` command for self, to be combined with other commands in :func:`ppath.Path.batch_exec`.
+
+        Examples:
+            >>> assert Path("/tmp").chmod_cmd() == ["chmod", "755", Path("/tmp")]
+            >>> assert Path("/tmp").chmod_cmd("o+t", recursive=True) == ["chmod", "-R", "o+t", Path("/tmp")]
+
+        Args:
+            mode: mode (default: 755 for directories and 644 for files).
+            follow_symlinks: resolve self if self is symlink (default: False).
+            recursive: change mode of self and all subdirectories (default: False).
+
+        Returns:
+            Command list.
+        """
+        is_dir = _stat_type(self) == stat.S_IFDIR
+        return [
+            self.chmod.__name__,
+            *(["-R"] if recursive and is_dir else []),
+            str(mode or (755 if is_dir else 644)),
+            self.resolve() if follow_symlinks else self,
+        ]
+
     def chown(self, passwd=None, effective_ids=False, exception=True, follow_symlinks=False, recursive=False):
         """
         Change owner of path
@@ -552,22 +763,47 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             raise ValueError(f"passwd must be string with user:group, or 'Passwd' instance, got {passwd}")
 
         passwd = passwd or Passwd.from_login()
-
-        subprocess.run([
-            *self.sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
-            f'{self.chown.__name__}',
-            *(["-R"] if recursive and self.is_dir() else []),
-            f'{passwd.user}:{passwd.group}' if isinstance(passwd, Passwd) else passwd,
-            self.resolve() if follow_symlinks else self
-        ], check=True, capture_output=True)
+        path = self.resolve() if follow_symlinks else self
+        try:
+            _chown(path, passwd, recursive=recursive)
+        except (KeyError, OSError):
+            subprocess.run([
+                *self.sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                *self.chown_cmd(passwd=passwd, follow_symlinks=follow_symlinks, recursive=recursive),
+            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
         return self
 
+    def chown_cmd(self, passwd=None, follow_symlinks=False, recursive=False):
+        """
+        `chown` command for self, to be combined with other commands in :func:`ppath.Path.batch_exec`.
+
+        Examples:
+            >>> assert Path("/tmp").chown_cmd("0:0") == ["chown", "0:0", Path("/tmp")]
+            >>> assert Path("/tmp").chown_cmd(Passwd.from_root(), recursive=True)[:2] == ["chown", "-R"]
+
+        Args:
+            passwd: user/group passwd to use, or string with user:group (default: login user).
+            follow_symlinks: resolve self if self is symlink (default: False).
+            recursive: change owner of self and all subdirectories (default: False).
+
+        Returns:
+            Command list.
+        """
+        return [
+            self.chown.__name__,
+            *(["-R"] if recursive and _stat_type(self) == stat.S_IFDIR else []),
+            _own(passwd or Passwd.from_login()),
+            self.resolve() if follow_symlinks else self,
+        ]
+
     def cmp(self, other):
         """
         Determine, whether two files provided to it are the same or not.
         By the same means that their contents are the same or not (excluding any metadata).
-        Uses Cryptographic Hashes (using SHA256 - Secure hash algorithm 256) as a hash function.
+
+        Files with different sizes are not read, small files (<64 KiB) are compared byte by byte, and
+        larger files are compared in blocks of 1 MiB (libc `memcmp`), stopping at the first different block.
 
         Examples:
             >>> import ppath
@@ -582,11 +818,22 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             True if equal.
         """
-        return self.checksum() == self.__class__(other).checksum()
+        other = self.__class__(other)
+        if (size := self.stat().st_size) != other.stat().st_size:
+            return False
+        if size < _CMP_BYTES_SIZE:
+            return self.read_bytes() == other.read_bytes()
+        # Direct comparison is faster than hashing both files and stops at the first difference.
+        with self.open('rb') as f, other.open('rb') as o:
+            read, other_read = f.read, o.read
+            while block := read(_CMP_BLOCK_SIZE):
+                if block != other_read(_CMP_BLOCK_SIZE):
+                    return False
+        return True
 
     def cp(self, dest, contents=False, effective_ids=False, follow_symlinks=False, preserve=False):
         """
-        Wrapper for shell `cp` command to copy file recursivily and adding sudo if necessary.
+        Copy file or directory recursively (`cp -R`), with `sudo cp` if permission is denied.
 
         Examples:
             >>> with Path.tempfile() as tmp:
@@ -624,6 +871,13 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             ...     file = tmp / filename
             ...     assert (tmp / filename).cmp(__file__)
             >>>
+            >>> with Path.tempcd() as tmp:
+            ...     link = tmp.mkdir("dir").touch("file").parent.ln("link")
+            ...     copied = link.cp("copy")
+            ...     assert copied.is_symlink() and os.readlink(copied) == os.readlink(link)
+            ...     followed = link.cp("followed", follow_symlinks=True)
+            ...     assert not followed.is_symlink() and (followed / "file").is_file()
+            >>>
             >>> Path("/tmp/foo").cp("/tmp/boo")  # doctest: +IGNORE_EXCEPTION_DETAIL
             Traceback (most recent call last):
             FileNotFoundError: ... No such file or directory: '/tmp/foo'
@@ -647,20 +901,44 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         """
         dest = self.__class__(dest)
 
-        if not self.exists():
+        if (st_type := _stat_type(self)) is None and not self.is_symlink():
             raise FileNotFoundError(f'path does not exist: {self}')
 
-        subprocess.run([
-            *dest.sudo(effective_ids=effective_ids, follow_symlinks=follow_symlinks),
-            f'{self.cp.__name__}',
-            *(["-R"] if self.is_dir() else []),
-            *(["-L"] if follow_symlinks else []),
-            *(["-p"] if preserve else []),
-            f"{str(self)}{'/' if contents else ''}", dest
-        ], check=True, capture_output=True)
+        try:
+            _cp(self, dest, contents=contents, follow_symlinks=follow_symlinks, preserve=preserve)
+        except OSError:
+            subprocess.run([
+                *dest.sudo(effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                *self.cp_cmd(dest, contents=contents, follow_symlinks=follow_symlinks, preserve=preserve),
+            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
         return dest
 
+    def cp_cmd(self, dest, contents=False, follow_symlinks=False, preserve=False):
+        """
+        `cp` command for self, to be combined with other commands in :func:`ppath.Path.batch_exec`.
+
+        Examples:
+            >>> assert Path("/tmp").cp_cmd("/var/tmp", contents=True) == ["cp", "-R", "/tmp/", Path("/var/tmp")]
+
+        Args:
+            dest: destination.
+            contents: copy contents of self to dest, `cp src/ dest` instead of `cp src dest` (default: False)`.
+            follow_symlinks: all symbolic links are followed `-L´ (default: False).
+            preserve: preserve file attributes (default: False).
+
+        Returns:
+            Command list.
+        """
+        return [
+            self.cp.__name__,
+            *(["-R"] if _stat_type(self) == stat.S_IFDIR else []),
+            *(["-L"] if follow_symlinks else []),
+            *(["-p"] if preserve else []),
+            f"{str(self)}{'/' if contents else ''}",
+            self.__class__(dest),
+        ]
+
     def exists(self) -> bool:
         """
         Check if file exists or is a broken link (super returns False if it is a broken link, we return True).
@@ -675,13 +953,17 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             ...    source.unlink()
             ...    assert destination.exists()
             ...    assert not pathlib.Path(destination).exists()
+            >>> Path("/etc\\x00garbage").exists()
+            False
 
         Returns:
             True if file exists or is broken link.
         """
-        if super().exists():
-            return True
-        return self.is_symlink()
+        try:
+            return _stat_type(self, follow_symlinks=False) is not None
+        except ValueError:
+            # Embedded null byte: False, like pathlib.
+            return False
 
     @classmethod
     def expandvars(cls, path=None):
@@ -725,17 +1007,18 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             File found in parents (str) or None
         """
-        path = self.resolve() if follow_symlinks else self
-        start = path
+        start = self.resolve() if follow_symlinks else self.absolute()
+        # Ancestors of a resolved path are already resolved: walk the string, a Path only for a file found.
+        path = str(start)
         while True:
-            if path.is_file():
+            st_type = _stat_type(path)
+            if st_type == stat.S_IFREG:
                 if exception:
                     raise NotADirectoryError(f'File: {path} found in path: {start}')
-                return path
-            elif path.is_dir() or (
-                    path := path.parent.resolve() if follow_symlinks else path.parent.absolute()
-            ) == self.__class__('/'):
+                return self.__class__(path)
+            elif st_type == stat.S_IFDIR or path == "/":
                 return None
+            path = path[:path.rfind("/")] or "/"
 
     def has(self, value):
         """
@@ -755,8 +1038,36 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             bool
         """
-        value = self.__class__(value) if isinstance(value, str) and "/" in value else toiter(value)
-        return all([item in self.parts for item in value])
+        if isinstance(value, str):
+            value = _split(value)
+        else:
+            value = toiter(value)
+        return self._parts_set.issuperset(value)
+
+    def iter_stats(self, follow_symlinks=False):
+        """
+        Iterate over directory entries with their :class:`ppath.PathStat`, as :func:`ppath.Path.stats`.
+
+        Uses :func:`os.scandir`, so the stat of entries is served from the entry when the platform
+        provides it with the directory listing, instead of a stat() per child.
+
+        Examples:
+            >>> with Path.tempdir() as tmp:
+            ...     file = tmp.touch("file")
+            ...     stats = dict(tmp.iter_stats())
+            ...     assert stats[file].result.st_ino == file.stat().st_ino
+            ...     assert stats[file].user == file.owner()
+
+        Args:
+            follow_symlinks: If False, and the entry is a symbolic link, examine the symbolic link itself
+                instead of the file the link points to (default: False).
+
+        Returns:
+            Iterator of path and :class:`ppath.PathStat` tuples.
+        """
+        with os.scandir(self) as it:
+            for entry in it:
+                yield self.__class__(entry.path), _pathstat(entry.stat(follow_symlinks=follow_symlinks))
 
     def ln(self, dest, force=True):
         """
@@ -779,6 +1090,14 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             ...     assert destination.resolve() == source.resolve()
             ...     assert destination.readlink().resolve() == source.resolve()
             ...
+            ...     dangling = tmp.touch("missing").ln("dangling")
+            ...     (tmp / "missing").rm()
+            ...     assert source.ln(dangling).resolve() == source.resolve()
+            ...
+            ...     other = tmp.touch("other").ln("other_link")
+            ...     assert source.ln(other).resolve() == source.resolve()
+            ...     assert (tmp / "other").is_file()
+            ...
             ...     touch = tmp.touch("touch")
             ...     _ = tmp.ln("touch", force=False)  # doctest: +IGNORE_EXCEPTION_DETAIL
             Traceback (most recent call last):
@@ -793,11 +1112,20 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         """
         # TODO: relative symlinks https://gist.dreamtobe.cn/willprice/311faace6fb4f514376fa405d2220615
         dest = self.__class__(dest)
-        if dest.is_symlink() and dest.readlink().resolve() == self.resolve():
+        try:
+            target = os.readlink(dest)
+        except OSError:
+            target = None
+        # Same literal target needs no resolve() of both sides.
+        if target is not None and (target == str(self) or self.__class__(target).resolve() == self.resolve()):
             return dest
-        if force and dest.exists():
+        try:
+            os.symlink(self, dest)
+        except FileExistsError:
+            if not force:
+                raise
             dest.rm(follow_symlinks=False)
-        self._accessor.symlink(self, dest)
+            os.symlink(self, dest)
         return dest
 
     def mkdir(self, name="", passwd=None, mode=None, effective_ids=False, follow_symlinks=False):
@@ -840,26 +1168,91 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             Path:
         """
         path = (self / str(name)).resolve() if follow_symlinks else (self / str(name))
-        if not path.is_dir() and path.file_in_parents(follow_symlinks=follow_symlinks) is None:
-            subprocess.run([
-                *path.sudo(effective_ids=effective_ids, follow_symlinks=follow_symlinks),
-                f'{self.mkdir.__name__}',
-                "-p",
-                *(["-m", str(mode)] if mode else []),
-                path
-            ], capture_output=True)
-
-            if passwd is not None:
-                path.chown(passwd=passwd, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
+        if _stat_type(path) != stat.S_IFDIR:
+            try:
+                os.makedirs(path, exist_ok=True)
+                if mode:
+                    _chmod(path, str(mode))
+            except (FileExistsError, NotADirectoryError):
+                # A file in the way: parents are only walked on error, to raise with the file found.
+                path.file_in_parents(follow_symlinks=follow_symlinks)
+                raise
+            except OSError:
+                _sh(
+                    path.sudo(effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                    [self.mkdir.__name__, "-p", *(["-m", str(mode)] if mode else []), path],
+                    *([[self.chown.__name__, _own(passwd), path]] if passwd is not None else []),
+                )
+            else:
+                if passwd is not None:
+                    path.chown(passwd=passwd, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
         return path
 
+    @classmethod
+    def mkdir_many(cls, paths, passwd=None, mode=None, effective_ids=False, follow_symlinks=False):
+        """
+        Create many directories as :func:`ppath.Path.mkdir`, parent paths are created.
+
+        Directories are created directly and the ones that can not be created (permission denied) are
+        created with a single `sudo sh -c 'mkdir -p ... && chown ...'`.
+
+        Examples:
+            >>> with Path.tempdir() as tmp:
+            ...     dirs = Path.mkdir_many([tmp / "1/2", tmp / "1/3", tmp / "4"])
+            ...     assert all(d.is_dir() for d in dirs)
+            ...     file = Path.touch_many([tmp / "4/file"])[0]
+            ...     Path.mkdir_many([file / "5"])  # doctest: +IGNORE_EXCEPTION_DETAIL
+            Traceback (most recent call last):
+            NotADirectoryError: File: .../4/file found in path: .../4/file/5
+
+        Args:
+            paths: iterable of paths.
+            passwd: group/user for chown, if None ownership will not be changed (default: None).
+            mode: mode.
+            effective_ids: If True, access will use the effective uid/gid instead of
+                the real uid/gid (default: False).
+            follow_symlinks: resolve paths, and follow symlinks for chown and sudo (default: False).
+
+        Raises:
+            NotADirectoryError: Directory can not be made because it's a file.
+
+        Returns:
+            List of paths.
+        """
+        rv, fallback, parents = [], [], {}
+        for path in map(cls, paths):
+            path = _resolve(path, parents) if follow_symlinks else path
+            rv.append(path)
+            if _stat_type(path) == stat.S_IFDIR:
+                continue
+            try:
+                os.makedirs(path, exist_ok=True)
+                if mode:
+                    _chmod(path, str(mode))
+            except (FileExistsError, NotADirectoryError):
+                # A file in the way: parents are only walked on error, to raise with the file found.
+                path.file_in_parents(follow_symlinks=follow_symlinks)
+                raise
+            except OSError:
+                fallback.append(path)
+            else:
+                if passwd is not None:
+                    path.chown(passwd=passwd, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
+        if fallback:
+            _sh(
+                fallback[0].sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                [cls.mkdir.__name__, "-p", *(["-m", str(mode)] if mode else []), *fallback],
+                *([[cls.chown.__name__, _own(passwd), *fallback]] if passwd is not None else []),
+            )
+        return rv
+
     def open(self, mode='r', buffering=-1, encoding=None, errors=None, newline=None, token=False):
         """
         Open the file pointed by this path and return a file object, as
         the built-in open() function does.
         """
         if token:
-            return tokenize.open(self.text) if self.is_file() else None
+            return _open_tokenize(self)
         return super().open(mode=mode, buffering=buffering, encoding=encoding, errors=errors, newline=newline)
 
     def privileges(self, effective_ids=False):
@@ -889,7 +1282,7 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             Path with real path.
         """
-        return self.__class__(self._accessor.realpath(self, strict=not exception))
+        return self.__class__(os.path.realpath(self, strict=not exception))
 
     def rm(self, *args, effective_ids=False, follow_symlinks=False, missing_ok=True):
         """
@@ -908,6 +1301,11 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             ...     pth.rm()
             ...     assert not pth.is_file()
             ...     assert Path('/tmp/a/a/a/a')().is_dir()
+            ...
+            ...     link = tmp.touch("source").ln(tmp / "link")
+            ...     (tmp / "source").rm()
+            ...     link.rm()
+            ...     assert not os.path.lexists(link)
 
         Raises:
             FileNotFoundError: ... No such file or directory: '/tmp/foo'
@@ -922,80 +1320,99 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         if not missing_ok and not self.exists():
             raise FileNotFoundError(f'{self} does not exist')
 
-        if (path := self.add(*args)).exists():
-            subprocess.run([
-                *path.sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
-                f'{self.rm.__name__}',
-                *(["-rf"] if self.is_dir() else []),
-                path.resolve() if follow_symlinks else path,
-            ], capture_output=True)
+        # Not followed, so broken links are removed too.
+        if _stat_type(path := self.add(*args), follow_symlinks=False) is not None:
+            target = path.resolve() if follow_symlinks else path
+            # shutil.rmtree already walks with os.scandir and dir_fd, one lstat here for the type.
+            is_dir = _stat_type(target, follow_symlinks=False) == stat.S_IFDIR
+            try:
+                if is_dir:
+                    shutil.rmtree(target)
+                else:
+                    os.unlink(target)
+            except OSError:
+                subprocess.run([
+                    *path.sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                    *target.rm_cmd(),
+                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-    def setid(self, name=None, uid=True, effective_ids=False, follow_symlinks=False):
+    def rm_cmd(self):
         """
-        Sets the set-user-ID-on-execution or set-group-ID-on-execution bits.
+        `rm` command for self, to be combined with other commands in :func:`ppath.Path.batch_exec`.
 
-        Works if interpreter binary is setuid `u+s,+x` (-rwsr-xr-x), and:
+        Examples:
+            >>> assert Path("/tmp").rm_cmd() == ["rm", "-rf", Path("/tmp")]
+            >>> assert Path("/tmp/foo").rm_cmd() == ["rm", "-f", Path("/tmp/foo")]
 
-           - executable script and setuid interpreter on shebang (#!/usr/bin/env setuid_interpreter).
-           - setuid_interpreter -m module (venv would be created as root
+        Returns:
+            Command list.
+        """
+        return [
+            self.rm.__name__,
+            "-rf" if _stat_type(self, follow_symlinks=False) == stat.S_IFDIR else "-f",
+            self,
+        ]
 
-        Works if interpreter binary is setuid `g+s,+x` (-rwxr-sr-x), and:
+    @classmethod
+    def rm_many(cls, paths, effective_ids=False, follow_symlinks=False, workers=16):
+        """
+        Delete many folders/files as :func:`ppath.Path.rm`, missing paths are ignored.
+
+        Paths are deleted in a thread pool (:func:`os.unlink` and :func:`shutil.rmtree` release the GIL)
+        and the ones that can not be deleted (permission denied) with a single `sudo rm -rf ...`.
 
         Examples:
-            >>> with Path.tempdir() as p:
-            ...     a = p.touch('a')
-            ...     _ = a.setid()
-            ...     assert a.stats().suid is True
-            ...     _ = a.setid(uid=False)
-            ...     assert a.stats().sgid is True
-            ...
-            ...     a.rm()
-            ...
-            ...     _ = a.touch()
-            ...     b = a.setid('b')
-            ...     assert b.stats().suid is True
-            ...     assert a.cmp(b) is True
-            ...
-            ...     _ = b.setid('b', uid=False)
-            ...     assert b.stats().sgid is True
-            ...
-            ...     _ = a.write_text('a')
-            ...     assert a.cmp(b) is False
-            ...     b = a.setid('b')
-            ...     assert b.stats().suid is True
-            ...     assert a.cmp(b) is True
+            >>> with Path.tempdir() as tmp:
+            ...     paths = [tmp("1/2"), tmp.touch("a.py"), tmp / "missing"]
+            ...     _ = Path.rm_many(paths)
+            ...     assert not any(p.exists() for p in paths)
+            ...     assert tmp("1").is_dir()
 
         Args:
-            name: name to rename if provided.
-            uid: True to set UID bit, False to set GID bit (default: True).
+            paths: iterable of paths.
             effective_ids: If True, access will use the effective uid/gid instead of
                 the real uid/gid (default: False).
-            follow_symlinks: True for resolved, False for absolute and None for relative
-                or doesn't exists (default: True).
+            follow_symlinks: True for resolved (default: False).
+            workers: maximum number of threads (default: 16).
 
         Returns:
-            Updated Path.
+            List of paths.
         """
-        change = False
-        chmod = f'{"u" if uid else "g"}+s,+x'
-        mod = (stat.S_ISUID if uid else stat.S_ISGID) | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
-        target = self.with_name(name) if name else self
-        if name and (not target.exists() or not self.cmp(target)):
-            self.cp(target, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
-            change = True
-        elif not (target.stats().result.st_mode & mod == mod):
-            change = True
-        if target.owner() != "root": change = True
-        if change:
-            # First: chown, second: chmod
-            target.chown(passwd=Passwd.from_root(), follow_symlinks=follow_symlinks)
-            target.chmod(mode=chmod, effective_ids=effective_ids, follow_symlinks=follow_symlinks, recursive=True)
-        return target
+        def rm(path):
+            target = path.resolve() if follow_symlinks else path
+            if (st_type := _stat_type(target, follow_symlinks=False)) is None:
+                return None
+            try:
+                if st_type == stat.S_IFDIR:
+                    shutil.rmtree(target)
+                else:
+                    os.unlink(target)
+            except FileNotFoundError:
+                return None
+            except OSError:
+                return target
+
+        rv = list(map(cls, paths))
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            fallback = [target for target in executor.map(rm, rv) if target is not None]
+        if fallback:
+            _sh(
+                fallback[0].sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                [cls.rm.__name__, "-rf", *fallback],
+            )
+        return rv
 
-    def setid_cp(self, name=None, uid=True, effective_ids=False, follow_symlinks=False):
+    def setid(self, name=None, uid=True, effective_ids=False, follow_symlinks=False):
         """
         Sets the set-user-ID-on-execution or set-group-ID-on-execution bits.
 
+        Works if interpreter binary is setuid `u+s,+x` (-rwsr-xr-x), and:
+
+           - executable script and setuid interpreter on shebang (#!/usr/bin/env setuid_interpreter).
+           - setuid_interpreter -m module (venv would be created as root
+
+        Works if interpreter binary is setuid `g+s,+x` (-rwxr-sr-x), and:
+
         Examples:
             >>> with Path.tempdir() as p:
             ...     a = p.touch('a')
@@ -1031,22 +1448,24 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             Updated Path.
         """
-        change = False
-        chmod = f'{"u" if uid else "g"}+s,+x'
-        mod = (stat.S_ISUID if uid else stat.S_ISGID) | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+        chmod, mod = _SETID[bool(uid)]
         target = self.with_name(name) if name else self
-        if name and (not target.exists() or not self.cmp(target)):
+        # One stat for existence, mode bits and owner.
+        st = _stat_or_none(target)
+        if name and (st is None or not self.cmp(target)):
             self.cp(target, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
             change = True
-        elif not (target.stats().result.st_mode & mod == mod):
-            change = True
-        if target.owner() != "root": change = True
+        else:
+            st = st or target.stat()
+            change = st.st_mode & mod != mod or st.st_uid != 0
         if change:
             # First: chown, second: chmod
             target.chown(passwd=Passwd.from_root(), follow_symlinks=follow_symlinks)
             target.chmod(mode=chmod, effective_ids=effective_ids, follow_symlinks=follow_symlinks, recursive=True)
         return target
 
+    setid_cp = setid
+
     @classmethod
     def setid_executable_cp(cls, name=None, uid=True):
         """
@@ -1108,25 +1527,7 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             uid: file UID
             user: file owner name
         """
-        mapping = dict(
-            sgid=stat.S_ISGID | stat.S_IXGRP,
-            suid=stat.S_ISUID | stat.S_IXUSR,
-            sticky=stat.S_ISVTX,
-        )
-        result = os.stat(self, follow_symlinks=follow_symlinks)
-        passwd = Passwd(result.st_uid)
-        return PathStat(
-            gid=result.st_gid,
-            group=grp.getgrgid(result.st_gid).gr_name,
-            mode=stat.filemode(result.st_mode),
-            own=f'{passwd.user}:{passwd.group}',
-            passwd=passwd,
-            result=result,
-            root=result.st_uid == 0,
-            uid=result.st_uid,
-            user=passwd.user,
-            **{i: result.st_mode & mapping[i] == mapping[i] for i in PathStat._fields if i in mapping.keys()}
-        )
+        return _pathstat(os.stat(self) if follow_symlinks else os.lstat(self))
 
     def sudo(self, force=False, to_list=True, os_mode=os.W_OK, effective_ids=False, follow_symlinks=False):
         """
@@ -1140,6 +1541,7 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             >>> assert Path('no_dir/no_file.text').sudo(to_list=False) == ''
             >>> assert Path('/tmp').sudo(follow_symlinks=True) == []
             >>> assert Path('/usr/bin').sudo() == [su]
+            >>> assert Path('/tmp').sudo(force=True) == [su]
 
         Args:
             force: if sudo installed and user is ot root, return always sudo path
@@ -1154,13 +1556,15 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             `sudo` or ``, str or list.
         """
-        if (rv := which()) and (os.geteuid if effective_ids else os.getuid)() != 0:
-            path = self
-            while path:
-                if path.access(os_mode=os_mode, effective_ids=effective_ids, follow_symlinks=follow_symlinks):
-                    if not force: rv = ''
+        if (rv := which()) and (os.geteuid if effective_ids else os.getuid)() != 0 and not force:
+            start = self.resolve() if follow_symlinks else self
+            # First existing ancestor decides, "/" is not checked (one stat and one access per ancestor).
+            for path in (start, *start.parents):
+                if _stat_type(path) is not None:
+                    if os.access(path, mode=os_mode, effective_ids=effective_ids, follow_symlinks=follow_symlinks):
+                        rv = ''
                     break
-                elif path.exists() or str(path := (path.parent.resolve() if follow_symlinks else path.parent)) == "/":
+                elif str(path.parent) == "/":
                     break
         return ([rv] if rv else []) if to_list else rv
 
@@ -1296,7 +1700,7 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         Returns:
             Path of directory if is file or self.
         """
-        return self.parent if self.is_file() else self
+        return self.parent if _stat_type(self) == stat.S_IFREG else self
 
     def touch(self, name="", passwd=None, mode=None, effective_ids=False, follow_symlinks=False):
         """
@@ -1322,6 +1726,9 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
             ...     assert last.owner() == getpass.getuser()
             ...     assert last.is_file() is True
             ...
+            ...     os.mkfifo(fifo := file.parent / "fifo")
+            ...     assert fifo.touch() == fifo and Path.touch_many([fifo]) == [fifo]
+            ...
             ...     file.rm()
 
         Args:
@@ -1337,20 +1744,96 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
         """
         path = self / str(name)
         path = path.resolve() if follow_symlinks else path.absolute()
-        if not path.is_file() and not path.is_dir() \
-                and path.parent.file_in_parents(follow_symlinks=follow_symlinks) is None:
-            if not (d := path.parent).exists():
-                d.mkdir(mode=mode, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
-            subprocess.run([
-                *path.sudo(effective_ids=effective_ids, follow_symlinks=follow_symlinks),
-                f'{self.touch.__name__}',
-                path
-            ], capture_output=True, check=True)
-            path.chmod(mode=mode, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
-            if passwd is not None:
-                path.chown(passwd=passwd, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
+        # Only missing paths are created: opening an existing FIFO with no reader would block.
+        if _stat_type(path) is None:
+            mkdir = _stat_type(d := path.parent) != stat.S_IFDIR
+            try:
+                if mkdir:
+                    os.makedirs(d, exist_ok=True)
+                    if mode:
+                        _chmod(d, str(mode))
+                os.close(os.open(path, os.O_CREAT | os.O_WRONLY | os.O_CLOEXEC, 0o666))
+            except (FileExistsError, NotADirectoryError):
+                # A file in the way: parents are only walked on error, to raise with the file found.
+                d.file_in_parents(follow_symlinks=follow_symlinks)
+                raise
+            except OSError:
+                # One `sudo sh -c 'mkdir && touch && chmod && chown'` instead of one sudo per command.
+                _sh(
+                    path.sudo(effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                    *([[self.mkdir.__name__, "-p", *(["-m", str(mode)] if mode else []), d]] if mkdir else []),
+                    [self.touch.__name__, path],
+                    [self.chmod.__name__, str(mode or 644), path],
+                    *([[self.chown.__name__, _own(passwd), path]] if passwd is not None else []),
+                    check=True,
+                )
+            else:
+                _touch_attributes(path, passwd=passwd, mode=mode, effective_ids=effective_ids,
+                                  follow_symlinks=follow_symlinks)
         return path
 
+    @classmethod
+    def touch_many(cls, paths, passwd=None, mode=None, effective_ids=False, follow_symlinks=False):
+        """
+        Create many files as :func:`ppath.Path.touch`, parent paths are created.
+
+        Files are created directly and the ones that can not be created (permission denied) are created
+        with a single `sudo sh -c 'mkdir -p ... && touch ... && chmod ... && chown ...'`.
+
+        Examples:
+            >>> with Path.tempdir() as tmp:
+            ...     files = Path.touch_many([tmp / "1/2/a.py", tmp / "1/2/b.py", tmp / "c.py"])
+            ...     assert all(f.is_file() for f in files)
+            ...     assert files[2].stats().mode == "-rw-r--r--"
+
+        Args:
+            paths: iterable of paths.
+            passwd: group/user for chown, if None ownership will not be changed (default: None).
+            mode: mode.
+            effective_ids: If True, access will use the effective uid/gid instead of
+                the real uid/gid (default: False).
+            follow_symlinks: resolve paths, and follow symlinks for chmod, chown and sudo (default: False).
+
+        Returns:
+            List of paths.
+        """
+        rv, dirs, fallback, parents = [], {}, [], {}
+        for path in map(cls, paths):
+            path = _resolve(path, parents) if follow_symlinks else path.absolute()
+            rv.append(path)
+            # Only missing paths are created: opening an existing FIFO with no reader would block.
+            if _stat_type(path) is not None:
+                continue
+            if (d := path.parent) not in dirs:
+                dirs[d] = _stat_type(d) != stat.S_IFDIR
+            try:
+                if dirs[d]:
+                    os.makedirs(d, exist_ok=True)
+                    if mode:
+                        _chmod(d, str(mode))
+                    dirs[d] = False
+                os.close(os.open(path, os.O_CREAT | os.O_WRONLY | os.O_CLOEXEC, 0o666))
+            except (FileExistsError, NotADirectoryError):
+                # A file in the way: parents are only walked on error, to raise with the file found.
+                d.file_in_parents(follow_symlinks=follow_symlinks)
+                raise
+            except OSError:
+                fallback.append(path)
+            else:
+                _touch_attributes(path, passwd=passwd, mode=mode, effective_ids=effective_ids,
+                                  follow_symlinks=follow_symlinks)
+        if fallback:
+            mkdir = [d for d, missing in dirs.items() if missing]
+            _sh(
+                fallback[0].sudo(force=True, effective_ids=effective_ids, follow_symlinks=follow_symlinks),
+                *([[cls.mkdir.__name__, "-p", *(["-m", str(mode)] if mode else []), *mkdir]] if mkdir else []),
+                [cls.touch.__name__, *fallback],
+                [cls.chmod.__name__, str(mode or 644), *fallback],
+                *([[cls.chown.__name__, _own(passwd), *fallback]] if passwd is not None else []),
+                check=True,
+            )
+        return rv
+
     def with_suffix(self, suffix=""):
         """
         Sets default for suffix to "", since :class:`pathlib.Path` does not have default.
@@ -1404,14 +1887,14 @@ class Passwd:
             Username
     """
     data: InitVar[Union[int, str]] = None
-    gid: int = field(default=None, init=False)
-    gecos: str = field(default=None, init=False)
-    group: str = field(default=None, init=False)
-    groups: dict[str, int] = field(default=None, init=False)
-    home: Path = field(default=None, init=False)
-    shell: Path = field(default=None, init=False)
-    uid: int = field(default=None, init=False)
-    user: str = field(default=None, init=False)
+    gid: int = field(init=False)
+    gecos: str = field(init=False)
+    group: str = field(init=False)
+    groups: dict[str, int] = field(init=False)
+    home: Path = field(init=False)
+    shell: Path = field(init=False)
+    uid: int = field(init=False)
+    user: str = field(init=False)
 
     def __post_init__(self, data: Union[int, str]):
         """
@@ -1443,6 +1926,10 @@ class Passwd:
             ...    assert "admin" in default.groups
             ... else:
             ...    assert user in default.groups
+            >>> Passwd("no_such_user")  # doctest: +IGNORE_EXCEPTION_DETAIL
+            Traceback (most recent call last):
+            KeyError: "getpwnam(): name not found: 'no_such_user'"
+            >>> assert _cache_passwd["no_such_user"] == ("getpwnam(): name not found: 'no_such_user'",)
 
         Errors:
             os.setuid(0)
@@ -1460,9 +1947,23 @@ class Passwd:
             Instance of :class:`ppath:Passwd`
         """
         if (isinstance(data, str) and not data.isnumeric()) or isinstance(data, Path):
-            passwd = pwd.getpwnam(cast(str, getattr(data, "owner", lambda: None)() or data))
+            key = cast(str, getattr(data, "owner", lambda: None)() or data)
         else:
-            passwd = pwd.getpwuid(int(data) if data or data == 0 else os.getuid())
+            key = int(data) if data or data == 0 else os.getuid()
+
+        if (cached := _cache_passwd.get(key)) is not None:
+            if isinstance(cached, tuple):
+                raise KeyError(*cached)
+            self.__dict__.update(cached.__dict__)
+            return
+
+        try:
+            passwd = _getpwnam(key) if isinstance(key, str) else _getpwuid(key)
+        except KeyError as exception:
+            # Negative hit, so unknown users do not query NSS again.
+            # Only the args: the exception's traceback would keep this frame alive.
+            _cache_passwd[key] = exception.args
+            raise
 
         self.gid = passwd.pw_gid
         self.gecos = passwd.pw_gecos
@@ -1470,12 +1971,33 @@ class Passwd:
         self.shell = Path(passwd.pw_shell)
         self.uid = passwd.pw_uid
         self.user = passwd.pw_name
+        _cache_passwd[self.uid] = _cache_passwd[self.user] = self
 
-        group = grp.getgrgid(self.gid)
-        self.group = group.gr_name
-        self.groups = {grp.getgrgid(gid).gr_name: gid for gid in os.getgrouplist(self.user, self.gid)}
-        if self.uid not in _cache_passwd:
-            _cache_passwd[self.uid] = _cache_passwd[self.user] = self
+    def __getattr__(self, name):
+        """
+        Looks up `group` and `groups` on first access, so no group NSS queries if not used.
+
+        Examples:
+            >>> passwd = Passwd(0)
+            >>> assert passwd.group == _getgrgid(0).gr_name
+            >>> assert "group" in vars(passwd)
+            >>> passwd.no_attribute  # doctest: +IGNORE_EXCEPTION_DETAIL
+            Traceback (most recent call last):
+            AttributeError: 'Passwd' object has no attribute 'no_attribute'
+        """
+        if name == "group":
+            self.group = _getgrgid(self.gid).gr_name
+            return self.group
+        if name == "groups":
+            if (etc := _etc_group()) is not None:
+                # Groups from the parsed /etc/group when it is the only source, no NSS queries.
+                names, members = etc
+                gids = dict.fromkeys((self.gid, *members.get(self.user, ())))
+                self.groups = {names.get(gid) or _getgrgid(gid).gr_name: gid for gid in gids}
+            else:
+                self.groups = {_getgrgid(gid).gr_name: gid for gid in _getgrouplist(self.user, self.gid)}
+            return self.groups
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     @property
     def is_su(self) -> bool:
@@ -1495,28 +2017,37 @@ class Passwd:
     @classmethod
     def from_login(cls):
         """Returns instance of :class:`ppath:Passwd` from '/dev/console' on macOS and `os.getlogin()` on Linux"""
+        # Login user does not change for the process, so it is only looked up once.
+        if isinstance(cached := _cache_passwd.get("__login__"), cls):
+            return cached
         try:
             user = Path('/dev/console').owner() if MACOS else os.getlogin()
         except OSError:
-            user = Path('/proc/self/loginuid').owner()
-        if user not in _cache_passwd:
-            return cls(user)
-        return _cache_passwd[user]
+            # File contains the login uid (it is owned by root), -1 (4294967295) if not set.
+            try:
+                with open('/proc/self/loginuid') as f:
+                    user = int(f.read())
+            except (OSError, ValueError):
+                user = os.getuid()
+            if user == 4294967295:
+                user = os.getuid()
+        _cache_passwd["__login__"] = rv = cls._get(user)
+        return rv
 
     @classmethod
     def from_sudo(cls):
         """Returns instance of :class:`ppath:Passwd` from `SUDO_USER` if set or current user"""
-        uid = os.environ.get("SUDO_UID", os.getuid())
-        if uid not in _cache_passwd:
-            return cls(uid)
-        return _cache_passwd[uid]
+        return cls._get(int(os.environ.get("SUDO_UID", os.getuid())))
 
     @classmethod
     def from_root(cls):
-        """Returns instance of :class:`ppath:Passwd` for root"""
-        if 0 not in _cache_passwd:
-            return cls(0)
-        return _cache_passwd[0]
+        """Returns instance of :class:`ppath:Passwd` for root (the same instance once looked up)"""
+        return cls._get(0)
+
+    @classmethod
+    def _get(cls, key):
+        """Returns the cached instance for uid or user, or a new instance (which raises if negative hit)"""
+        return cached if isinstance(cached := _cache_passwd.get(key), cls) else cls(key)
 
 
 PathStat = collections.namedtuple('PathStat', 'gid group mode own passwd result root sgid sticky suid uid user')
@@ -1539,6 +2070,631 @@ Args:
 """
 
 
+class _Crc32:
+    """
+    :func:`zlib.crc32` with :mod:`hashlib` interface, for :func:`ppath.Path.checksum`.
+
+    Examples:
+        >>> crc = _Crc32()
+        >>> crc.update(b"Hello")
+        >>> assert crc.hexdigest() == "f7d18982"
+    """
+    name = "crc32"
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        """Update with bytes-like object (zlib releases the GIL for large buffers)."""
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        """Returns checksum as 8 hex digits."""
+        return f"{self.value:08x}"
+
+
+def _chmod(path, mode, recursive=False):
+    """
+    Change mode of path with :func:`os.chmod`, no subprocess.
+
+    Symlinks found while walking recursively are ignored, as `chmod -R` does.
+
+    Examples:
+        >>> with Path.tempfile() as tmp:
+        ...     _chmod(tmp.path, "640")
+        ...     assert tmp.path.stats().mode == "-rw-r-----"
+        ...     _chmod(tmp.path, "u+x,o=r")
+        ...     assert tmp.path.stats().mode == "-rwxr--r--"
+
+    Args:
+        path: path.
+        mode: numeric (i.e.: "755") or symbolic (i.e.: "u+s,+x") mode.
+        recursive: change mode of path and all its contents (default: False).
+
+    Raises:
+        OSError: if operation is not permitted or fails.
+    """
+    os.chmod(path, _chmod_mode(mode, os.stat(path).st_mode))
+    if recursive and os.path.isdir(path):
+        # Names relative to the directory fd: one component lookup per entry.
+        for _, dirs, files, fd in os.fwalk(path):
+            for name in dirs + files:
+                if not stat.S_ISLNK(st_mode := os.stat(name, dir_fd=fd, follow_symlinks=False).st_mode):
+                    os.chmod(name, _chmod_mode(mode, st_mode), dir_fd=fd)
+
+
+def _chmod_mode(mode, st_mode=0):
+    """
+    Mode bits from numeric or symbolic `chmod` mode.
+
+    Examples:
+        >>> assert _chmod_mode("755") == 0o755
+        >>> assert _chmod_mode(644) == 0o644
+        >>> assert _chmod_mode("u+s,+x", 0o100644) == 0o4755
+        >>> assert _chmod_mode("g+s,+x", 0o100644) == 0o2755
+        >>> assert _chmod_mode("go+rx", 0o40700) == 0o755
+        >>> assert _chmod_mode("o-x", 0o100777) == 0o776
+        >>> assert _chmod_mode("a=rX", 0o40777) == 0o555
+        >>> assert _chmod_mode("a=rX", 0o100644) == 0o444
+        >>> _chmod_mode("u+z")  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ValueError: invalid mode: 'u+z'
+
+    Args:
+        mode: numeric (i.e.: 755) or symbolic (i.e.: "u+s,+x") mode.
+        st_mode: current `st_mode` of the file, used for symbolic modes (default: 0).
+
+    Raises:
+        ValueError: invalid mode.
+
+    Returns:
+        Mode bits.
+    """
+    if str(mode).isdigit():
+        return int(str(mode), 8)
+    rv = stat.S_IMODE(st_mode)
+    umask = None
+    for clause in str(mode).split(","):
+        if not (match := re.fullmatch(r"([ugoa]*)((?:[-+=][rwxXst]*)+)", clause)):
+            raise ValueError(f"invalid mode: {mode!r}")
+        who = 0
+        for w in match.group(1) or "a":
+            who |= _CHMOD_WHO[w]
+        for op, perms in re.findall(r"([-+=])([rwxXst]*)", match.group(2)):
+            bits = 0
+            for p in perms:
+                if p != "X":
+                    bits |= _CHMOD_PERM[p]
+                elif stat.S_ISDIR(st_mode) or rv & 0o111:
+                    bits |= _CHMOD_PERM["x"]
+            bits &= who
+            if not match.group(1):
+                if umask is None:
+                    umask = _umask()
+                bits &= ~umask
+            if op == "+":
+                rv |= bits
+            elif op == "-":
+                rv &= ~bits
+            else:
+                rv = rv & ~who | bits
+    return rv
+
+
+def _chown(path, passwd, recursive=False):
+    """
+    Change owner of path with :func:`os.chown`, no subprocess.
+
+    Symlinks found while walking recursively are changed and not followed, as `chown -R` does.
+
+    Args:
+        path: path.
+        passwd: user/group passwd to use, or string with user:group.
+        recursive: change owner of path and all its contents (default: False).
+
+    Raises:
+        OSError: if operation is not permitted or fails.
+    """
+    if isinstance(passwd, Passwd):
+        uid, gid = passwd.uid, passwd.gid
+    else:
+        user, _, group = passwd.partition(":")
+        uid = (int(user) if user.isdigit() else _getpwnam(user).pw_uid) if user else -1
+        gid = (int(group) if group.isdigit() else _getgrnam(group).gr_gid) if group else -1
+    os.chown(path, uid, gid, follow_symlinks=not recursive)
+    if recursive and os.path.isdir(path):
+        for _, dirs, files, fd in os.fwalk(path):
+            for name in dirs + files:
+                os.chown(name, uid, gid, dir_fd=fd, follow_symlinks=False)
+
+
+def _clonefile_function():
+    """
+    Returns libc `clonefile` function or None if not macOS or not available (APFS copy-on-write clone).
+
+    Returns:
+        :class:`ctypes.CDLL` function or None.
+    """
+    if not MACOS:
+        return None
+    try:
+        function = ctypes.CDLL(None, use_errno=True).clonefile
+    except (AttributeError, OSError):
+        return None
+    function.restype = ctypes.c_int
+    return function
+
+
+_clonefile = _clonefile_function()
+
+
+def _cp(src, dest, contents=False, follow_symlinks=False, preserve=False):
+    """
+    Copy file or directory recursively with :mod:`shutil`, no subprocess.
+
+    Works as `cp -R`: directory is copied inside dest if dest is a directory, or to its contents if contents
+    is True (`cp -R src/ dest`). Mode of existing files is not changed and new files get mode of source
+    masked by umask (unless preserve).
+
+    On macOS new files are cloned with `clonefile` (no data is copied on APFS), and so are new directories
+    if preserve and not follow_symlinks. Falls back to copy if the clone fails (i.e.: other volume).
+
+    Args:
+        src: source.
+        dest: destination.
+        contents: copy contents of src to dest (default: False)`.
+        follow_symlinks: copy the files the symlinks point to, instead of the symlink (default: False).
+        preserve: preserve mode, ownership and timestamps (default: False).
+
+    Raises:
+        OSError: if operation is not permitted or fails.
+    """
+    umask = _umask()
+
+    def attributes(source, destination, exists):
+        st = os.stat(source)
+        if preserve:
+            shutil.copystat(source, destination)
+            with contextlib.suppress(PermissionError):
+                os.chown(destination, st.st_uid, st.st_gid)
+        elif not exists:
+            os.chmod(destination, stat.S_IMODE(st.st_mode) & ~umask)
+
+    def clone(source, destination):
+        return _clonefile is not None and _clonefile(os.fsencode(source), os.fsencode(destination), 0) == 0
+
+    def copy(source, destination):
+        if not (exists := os.path.exists(destination)) and clone(source, destination):
+            return attributes(source, destination, exists)
+        shutil.copyfile(source, destination)
+        attributes(source, destination, exists)
+
+    def copytree(source, destination):
+        if not (exists := os.path.isdir(destination)):
+            if preserve and not follow_symlinks and clone(source, destination):
+                return attributes(source, destination, exists)
+            os.mkdir(destination)
+        with os.scandir(source) as entries:
+            for entry in entries:
+                target = os.path.join(destination, entry.name)
+                if not follow_symlinks and entry.is_symlink():
+                    if os.path.lexists(target):
+                        os.unlink(target)
+                    os.symlink(os.readlink(entry.path), target)
+                elif entry.is_dir():
+                    copytree(entry.path, target)
+                else:
+                    copy(entry.path, target)
+        attributes(source, destination, exists)
+
+    if not follow_symlinks and not contents and os.path.islink(src):
+        # Recreated as `cp -R` does, not copied as the directory it may point to.
+        target = os.path.join(dest, src.name) if os.path.isdir(dest) else dest
+        if os.path.lexists(target):
+            os.unlink(target)
+        os.symlink(os.readlink(src), target)
+    elif os.path.isdir(src):
+        copytree(src, dest if contents or not os.path.isdir(dest) else os.path.join(dest, src.name))
+    else:
+        copy(src, os.path.join(dest, src.name) if os.path.isdir(dest) else dest)
+
+
+@functools.lru_cache(maxsize=None)
+def _etc_group(group="/etc/group", nsswitch="/etc/nsswitch.conf"):
+    """
+    Parse group file once, if it is the only source for groups in nsswitch.
+
+    Examples:
+        >>> with Path.tempdir() as tmp:
+        ...     _ = (tmp / "nsswitch.conf").write_text("passwd: files\\ngroup:  files [SUCCESS=merge]\\n")
+        ...     lines = "root:x:0:\\n# comment\\nadm:x:4:syslog,user\\nbad:x:x:user\\nuser:x:1000:\\n"
+        ...     _ = (tmp / "group").write_text(lines)
+        ...     names, members = _etc_group(tmp / "group", tmp / "nsswitch.conf")
+        ...     assert names == {0: "root", 4: "adm", 1000: "user"}
+        ...     assert members == {"syslog": (4,), "user": (4,)}
+        ...     _ = (tmp / "nsswitch.sss").write_text("group: files sss\\n")
+        ...     assert _etc_group(tmp / "group", tmp / "nsswitch.sss") is None
+
+    Args:
+        group: group file (default: "/etc/group").
+        nsswitch: nsswitch file (default: "/etc/nsswitch.conf").
+
+    Returns:
+        Tuple with dict of gid to name and dict of user to supplementary gids,
+        or None if other sources are used (i.e.: LDAP, macOS).
+    """
+    try:
+        with open(nsswitch) as f:
+            sources = next((line.split(":", 1)[1] for line in f if line.startswith("group:")), "files")
+        if set(re.sub(r"\[.*?]", "", sources).split()) != {"files"}:
+            return None
+        with open(group) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    names, members = {}, {}
+    for line in lines:
+        if line.startswith(("#", "+", "-")) or len(fields := line.split(":")) != 4 or not fields[2].isdigit():
+            continue
+        names[gid := int(fields[2])] = fields[0]
+        for user in filter(None, fields[3].split(",")):
+            members[user] = (*members.get(user, ()), gid)
+    return names, members
+
+
+@functools.lru_cache(maxsize=1024)
+def _getgrgid(gid):
+    """
+    Cached :func:`grp.getgrgid`.
+
+    Examples:
+        >>> assert _getgrgid(0) is _getgrgid(0)
+        >>> assert _getgrgid(0).gr_gid == 0
+
+    Args:
+        gid: group id.
+
+    Returns:
+        :class:`grp.struct_group` (an immutable copy, not the libc static struct).
+    """
+    return grp.getgrgid(gid)
+
+
+@functools.lru_cache(maxsize=1024)
+def _getgrnam(group):
+    """
+    Cached :func:`grp.getgrnam`.
+
+    Args:
+        group: group name.
+
+    Returns:
+        :class:`grp.struct_group` (an immutable copy, not the libc static struct).
+    """
+    return grp.getgrnam(group)
+
+
+@functools.lru_cache(maxsize=1024)
+def _getgrouplist(user, gid):
+    """
+    Cached :func:`os.getgrouplist`.
+
+    Args:
+        user: username.
+        gid: primary group id.
+
+    Returns:
+        Tuple of group ids.
+    """
+    return tuple(os.getgrouplist(user, gid))
+
+
+@functools.lru_cache(maxsize=1024)
+def _getpwnam(user):
+    """
+    Cached :func:`pwd.getpwnam`.
+
+    Args:
+        user: username.
+
+    Returns:
+        :class:`pwd.struct_passwd` (an immutable copy, not the libc static struct).
+    """
+    return pwd.getpwnam(user)
+
+
+@functools.lru_cache(maxsize=1024)
+def _getpwuid(uid):
+    """
+    Cached :func:`pwd.getpwuid`.
+
+    Examples:
+        >>> assert _getpwuid(0) is _getpwuid(0)
+        >>> assert _getpwuid(0).pw_uid == 0
+
+    Args:
+        uid: user id.
+
+    Returns:
+        :class:`pwd.struct_passwd` (an immutable copy, not the libc static struct).
+    """
+    return pwd.getpwuid(uid)
+
+
+def _open_tokenize(path):
+    """
+    Open a regular file for reading with the encoding detected by :func:`tokenize.detect_encoding`,
+    as :func:`tokenize.open`, for :func:`ppath.Path.open`.
+
+    The file is checked to be regular with `fstat` on the opened descriptor, instead of a stat before
+    opening. Non-blocking open, so FIFOs are not waited for.
+
+    Examples:
+        >>> with _open_tokenize(__file__) as f:
+        ...     assert f.encoding == "utf-8"
+        >>> assert _open_tokenize("/tmp") is None
+        >>> assert _open_tokenize("/tmp/foo/boo") is None
+
+    Args:
+        path: path.
+
+    Returns:
+        Text file or None if path is not a file.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC | os.O_NONBLOCK)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    if not stat.S_ISREG(os.fstat(fd).st_mode):
+        os.close(fd)
+        return None
+    os.set_blocking(fd, True)
+    buffer = open(fd, "rb")
+    try:
+        encoding, _ = tokenize.detect_encoding(buffer.readline)
+        buffer.seek(0)
+        text = TextIOWrapper(buffer, encoding, line_buffering=True)
+        text.mode = "r"
+        return text
+    except BaseException:
+        buffer.close()
+        raise
+
+
+def _own(passwd):
+    """
+    Owner argument for `chown`.
+
+    Examples:
+        >>> assert _own("0:0") == "0:0"
+        >>> assert _own(Passwd.from_root()).startswith("root:")
+
+    Args:
+        passwd: user/group passwd to use, or string with user:group.
+
+    Returns:
+        String with user:group.
+    """
+    return f'{passwd.user}:{passwd.group}' if isinstance(passwd, Passwd) else passwd
+
+
+def _pathstat(result):
+    """
+    :class:`ppath.PathStat` from `os.stat` result, for :func:`ppath.Path.stats` and :func:`ppath.Path.iter_stats`.
+
+    Examples:
+        >>> assert _pathstat(os.stat("/")).root is True
+
+    Args:
+        result: result of `os.stat` or :meth:`os.DirEntry.stat`.
+
+    Returns:
+        PathStat namedtuple :class:`ppath.PathStat`.
+    """
+    # Cached instance for the owner, no new Passwd per file.
+    passwd = Passwd._get(result.st_uid)
+    mode = result.st_mode
+    return PathStat(
+        gid=result.st_gid,
+        group=passwd.group if passwd.gid == result.st_gid else _getgrgid(result.st_gid).gr_name,
+        mode=stat.filemode(mode),
+        own=f'{passwd.user}:{passwd.group}',
+        passwd=passwd,
+        result=result,
+        root=result.st_uid == 0,
+        sgid=mode & _STAT_SGID == _STAT_SGID,
+        sticky=mode & _STAT_STICKY == _STAT_STICKY,
+        suid=mode & _STAT_SUID == _STAT_SUID,
+        uid=result.st_uid,
+        user=passwd.user,
+    )
+
+
+def _resolve(path, parents):
+    """
+    Resolve path reusing the resolved parents of previous paths, for :func:`ppath.Path.mkdir_many`
+    and :func:`ppath.Path.touch_many`.
+
+    Only the parent is resolved and cached by the caller for the duration of the batch, siblings pay a
+    single lstat for their name.
+
+    Examples:
+        >>> parents = {}
+        >>> with Path.tempdir() as tmp:
+        ...     source = tmp.touch("source")
+        ...     link = source.ln(tmp / "link")
+        ...     assert _resolve(tmp / "file", parents) == (tmp / "file").resolve()
+        ...     assert _resolve(link, parents) == source.resolve()
+        ...     assert str(tmp) in parents
+
+    Args:
+        path: path.
+        parents: dict with resolved parents.
+
+    Returns:
+        Resolved path.
+    """
+    if path.name in ("", ".."):
+        return path.resolve()
+    if (parent := parents.get(key := str(path.parent))) is None:
+        parent = parents[key] = os.path.realpath(key)
+    candidate = os.path.join(parent, path.name)
+    return path.__class__(os.path.realpath(candidate) if os.path.islink(candidate) else candidate)
+
+
+def _sh(sudo, *commands, check=False):
+    """
+    Run commands joined with `&&` in a single `sh -c` process, prefixed with sudo if provided.
+
+    Examples:
+        >>> with Path.tempdir() as tmp:
+        ...     _ = _sh([], ["mkdir", tmp / "a b"], ["touch", tmp / "a b" / "c"])
+        ...     assert (tmp / "a b" / "c").is_file()
+        >>> _sh([], ["false"], ["true"], check=True)  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ppath.CalledProcessError:
+
+    Args:
+        sudo: sudo command list, from :func:`ppath.Path.sudo`.
+        *commands: commands as lists of arguments.
+        check: raise :class:`CalledProcessError` if exit code is non-zero (default: False).
+
+    Raises:
+        CalledProcessError: if check and any command fails.
+
+    Returns:
+        :class:`subprocess.CompletedProcess`.
+    """
+    script = " && ".join(shlex.join(map(str, command)) for command in commands)
+    return subprocess.run([*sudo, "sh", "-c", script], check=check,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE if check else subprocess.DEVNULL)
+
+
+@functools.lru_cache(maxsize=1024)
+def _split(value, sep=" "):
+    """
+    Cached split of str for :func:`ppath.Path.__contains__` and :func:`ppath.Path.has`.
+
+    Strings with "/" are split in path parts, as :attr:`pathlib.PurePath.parts`, and sep is ignored.
+
+    Examples:
+        >>> assert _split("usr local") == ("usr", "local")
+        >>> assert _split("usr local") is _split("usr local")
+        >>> assert _split("/usr//local/") == ("/", "usr", "local")
+
+    Args:
+        value: string.
+        sep: separator (default: " ").
+
+    Returns:
+        Tuple of str.
+    """
+    return pathlib.PurePosixPath(value).parts if "/" in value else tuple(value.split(sep))
+
+
+def _stat_or_none(path, follow_symlinks=True):
+    """
+    Single :func:`os.stat` to derive exists/is_dir/is_file from `st_mode`.
+
+    Examples:
+        >>> assert stat.S_ISDIR(_stat_or_none("/").st_mode)
+        >>> assert _stat_or_none("/tmp/foo/boo") is None
+        >>> assert _stat_or_none(f"{__file__}/foo") is None
+        >>> with Path.tempcd() as tmp:
+        ...     os.symlink("loop", "loop")
+        ...     assert _stat_or_none("loop") is None
+        ...     assert stat.S_ISLNK(_stat_or_none("loop", follow_symlinks=False).st_mode)
+
+    Args:
+        path: path.
+        follow_symlinks: stat the file the symlink points to (default: True).
+
+    Returns:
+        :class:`os.stat_result` or None if path does not exist (or is a symlink loop).
+    """
+    try:
+        return os.stat(path, follow_symlinks=follow_symlinks)
+    except OSError as exception:
+        if exception.errno not in _STAT_IGNORED_ERRNOS:
+            raise
+        return None
+
+
+def _stat_type(path, follow_symlinks=True):
+    """
+    File type bits of path with a single :func:`os.stat`, or :func:`os.lstat` if not follow_symlinks.
+
+    Examples:
+        >>> assert _stat_type("/") == stat.S_IFDIR
+        >>> assert _stat_type(__file__) == stat.S_IFREG
+        >>> assert _stat_type("/tmp/foo/boo") is None
+        >>> assert _stat_type(f"{__file__}/foo") is None
+        >>> _stat_type("/etc\\x00garbage")  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ValueError: embedded null byte
+
+    Args:
+        path: path.
+        follow_symlinks: type of the file the symlink points to (default: True).
+
+    Returns:
+        :func:`stat.S_IFMT` of `st_mode` or None if path does not exist.
+    """
+    st = _stat_or_none(path, follow_symlinks=follow_symlinks)
+    return None if st is None else stat.S_IFMT(st.st_mode)
+
+
+def _touch_attributes(path, passwd=None, mode=None, effective_ids=False, follow_symlinks=False):
+    """
+    Set mode and owner of a file just created by :func:`ppath.Path.touch`, only if they do not match.
+
+    Args:
+        path: path.
+        passwd: group/user for chown, if None ownership will not be changed (default: None).
+        mode: mode, 644 if None.
+        effective_ids: If True, access will use the effective uid/gid instead of
+            the real uid/gid (default: False).
+        follow_symlinks: follow symlinks for chmod, chown and their sudo fallback (default: False).
+    """
+    st = os.stat(path)
+    try:
+        chmod = _chmod_mode(mode or 644, st.st_mode) != stat.S_IMODE(st.st_mode)
+    except ValueError:
+        chmod = True
+    if chmod:
+        path.chmod(mode=mode, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
+    if passwd is not None and not (
+            isinstance(passwd, Passwd) and (passwd.uid, passwd.gid) == (st.st_uid, st.st_gid)
+    ):
+        path.chown(passwd=passwd, effective_ids=effective_ids, follow_symlinks=follow_symlinks)
+
+
+def _umask():
+    """
+    Process umask without changing it, from `/proc/self/status` on Linux.
+
+    Reading it with :func:`os.umask` sets it to 0 for all threads until it is restored, so that is only
+    done once at import, and used where `/proc` is not available (i.e.: macOS).
+
+    Examples:
+        >>> old = os.umask(0o27)
+        >>> assert _umask() == 0o27 or not os.path.exists("/proc/self/status")
+        >>> _ = os.umask(old)
+
+    Returns:
+        Umask bits.
+    """
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    return _UMASK
+
+
+os.umask(_UMASK := os.umask(0))
+
+
 def command(*args, **kwargs) -> subprocess.CompletedProcess:
     """
     Exec Command with the following defaults compared to :func:`subprocess.run`:
@@ -1601,16 +2757,24 @@ def toiter(obj, always=False, split=" "):
     return obj
 
 
+@functools.lru_cache(maxsize=1024)
 def which(cmd="sudo"):
     """
     Checks if cmd or path is executable or exported bash function.
 
+    Results are cached by cmd with :func:`functools.lru_cache` (also misses), so `sudo` is only looked up
+    once per process. Names not found in PATH are checked against known shell builtins and the bash
+    functions exported in the environment (`BASH_FUNC_<name>%%`), without starting a shell.
+
     Examples:
         >>> assert which() == '/usr/bin/sudo'
         >>> assert which('/usr/local') == ''
         >>> assert which('/usr/bin/sudo') == '/usr/bin/sudo'
         >>> assert which('let') == 'let'
         >>> assert which('source') == 'source'
+        >>> os.environ["BASH_FUNC_ppath_which%%"] = "() {  true; }"
+        >>> assert which('ppath_which') == 'ppath_which'
+        >>> del os.environ["BASH_FUNC_ppath_which%%"]
 
     Args:
         cmd: command or path.
@@ -1618,9 +2782,8 @@ def which(cmd="sudo"):
     Returns:
         Cmd path.
     """
-    key = Path(cmd).name
-    if key not in _cache_which:
-        value = shutil.which(cmd, mode=os.X_OK) or subprocess.run(
-            f'command -v {cmd}', shell=True, text=True, capture_output=True).stdout.rstrip('\n') or ''
-        _cache_which[key] = value
-    return _cache_which[key]
+    if rv := shutil.which(cmd, mode=os.X_OK):
+        return rv
+    if cmd in _SHELL_BUILTINS or f"BASH_FUNC_{cmd}%%" in os.environ or f"BASH_FUNC_{cmd}()" in os.environ:
+        return cmd
+    return ''
@@ -22,6 +22,7 @@ from typing import AnyStr
 from typing import BinaryIO
 from typing import IO
 from typing import Iterable
+from typing import Iterator
 from typing import Literal
 from typing import MutableMapping
 from typing import MutableSequence
@@ -75,7 +76,7 @@ class PathAccessor:
     realpath: Type[pathlib._NormalAccessor.realpath] = os.path.realpath
 class Path(pathlib.Path, pathlib.PurePosixPath):
     _accessor: PathAccessor = ...
-    def __call__(self, name: AnyPath = ..., file: PIs = ..., passwd: Optional[Passwd] = ...,
+    def __call__(self, name: AnyPath = ..., file: Union[PIs, str] = ..., passwd: Optional[Passwd] = ...,
                  mode: Union[int, str] = ..., effective_ids: bool = ..., follow_symlinks: bool = ...) -> Path: ...
     def __new__(cls: Type[Path], *args: AnyPath, **kwargs: Any) -> Path: ...
     def __contains__(self, value: Iterable) -> bool: ...
@@ -94,31 +95,52 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
                follow_symlinks: bool = ...) -> Optional[bool]: ...
     def add(self, *args: str, exception: bool = ...) -> Path: ...
     def append_text(self, text: str, encoding: str = ..., errors = ...) -> str: ...
+    @classmethod
+    @contextlib.contextmanager
+    def batch(cls, sudo: bool = ...) -> list: ...
+    @classmethod
+    def batch_exec(cls, *commands: list, sudo: bool = ...) -> subprocess.CompletedProcess: ...
     @contextlib.contextmanager
     def cd(self) -> Path: ...
     def chdir(self) -> Path: ...
-    def checksum(self, algorithm: Literal['md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512'] = ...,
+    def checksum(self, algorithm: Literal['crc32', 'md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512'] = ...,
                  block_size: int = ...) -> str: ...
+    def checksum_mmap(self, algorithm: Literal['crc32', 'md5', 'sha1', 'sha224', 'sha256', 'sha384',
+                                               'sha512'] = ...) -> str: ...
     def chmod(self, mode: Optional[Union[int, str]] = ..., effective_ids: bool = ..., exception: bool = ...,
               follow_symlinks: bool = ..., recursive: bool = ...) -> Path: ...
+    def chmod_cmd(self, mode: Optional[Union[int, str]] = ..., follow_symlinks: bool = ...,
+                  recursive: bool = ...) -> list: ...
     def chown(self, passwd: Optional[Passwd, str] = ..., effective_ids: bool = ..., exception: bool = ...,
               follow_symlinks: bool = ..., recursive: bool = ...) -> Path: ...
+    def chown_cmd(self, passwd: Optional[Passwd, str] = ..., follow_symlinks: bool = ...,
+                  recursive: bool = ...) -> list: ...
     def cmp(self, other: AnyPath) -> bool: ...
     def cp(self, dest: AnyPath, contents: bool = False, effective_ids: bool = ..., follow_symlinks: bool = ...,
            preserve: bool = ...) -> Path: ...
+    def cp_cmd(self, dest: AnyPath, contents: bool = ..., follow_symlinks: bool = ...,
+               preserve: bool = ...) -> list: ...
     def exists(self) -> bool: ...
     @classmethod
     def expandvars(cls, path: Optional[str] = ...) -> Path: ...
     def file_in_parents(self, exception: bool = ..., follow_symlinks: bool = ...) -> Optional[Path]: ...
     def has(self, value: Iterable) -> bool: ...
+    def iter_stats(self, follow_symlinks: bool = ...) -> Iterator[tuple[Path, PathStat]]: ...
     def ln(self, dest: AnyPath, force: bool = ...) -> Path: ...
     def mkdir(self, name: AnyPath = ..., passwd: Optional[Passwd] = ..., mode: Union[int, str] = ...,
               effective_ids: bool = ..., follow_symlinks: bool = ...) -> Path: ...
+    @classmethod
+    def mkdir_many(cls, paths: Iterable[AnyPath], passwd: Optional[Passwd] = ..., mode: Union[int, str] = ...,
+                   effective_ids: bool = ..., follow_symlinks: bool = ...) -> list[Path]: ...
     def open(self, mode: str = ..., buffering: int = ..., encoding: str = ..., errors: str = ..., newline: str = ...,
              token: bool = ...) -> Optional[OpenIO]: ...
     def realpath(self, exception: bool = ...) -> Path: ...
     def rm(self, *args: str, effective_ids: bool = ..., follow_symlinks: bool = ...,
            missing_ok: bool = ...) -> None: ...
+    def rm_cmd(self) -> list: ...
+    @classmethod
+    def rm_many(cls, paths: Iterable[AnyPath], effective_ids: bool = ..., follow_symlinks: bool = ...,
+                workers: int = ...) -> list[Path]: ...
     def setid(self, name: Optional[Union[bool, str]], uid: bool = ...) -> Path: ...
     def setid_cp(self, name: Optional[Union[bool, str]], uid: bool = ...) -> Path: ...
     def setid_executable_cp(self, name: Optional[str], uid: bool = ...) -> Path: ...
@@ -145,6 +167,9 @@ class Path(pathlib.Path, pathlib.PurePosixPath):
     def to_parent(self) -> Path: ...
     def touch(self, name: AnyPath = ..., passwd: Optional[Passwd] = ..., mode: Union[int, str] = ...,
               effective_ids: bool = ..., follow_symlinks: bool = ...) -> Path: ...
+    @classmethod
+    def touch_many(cls, paths: Iterable[AnyPath], passwd: Optional[Passwd] = ..., mode: Union[int, str] = ...,
+                   effective_ids: bool = ..., follow_symlinks: bool = ...) -> list[Path]: ...
     def with_suffix(self, suffix: str = ...) -> Path: ...
 PathStat = NamedTuple('PathStat', gid=int, group=str, mode=str, own=str, passwd=Passwd, result=os.stat_result,
                       root=bool, sgid=bool, sticky=bool, suid=bool, uid=int, user=str)
@@ -2,9 +2,14 @@
 """
 Setuid Package
 """
+import os
 import sys
-from pathlib import Path
-from subprocess import getoutput
+from subprocess import PIPE
+from subprocess import run
+from subprocess import STDOUT
+
+_DEMO = os.path.join(os.path.dirname(__file__), 'demo.py')
+"""Path of the demo script, run by `main('demo')`."""
 
 
 def main(*args):
@@ -12,8 +17,11 @@ def main(*args):
     Main function
     """
     if args and args[0] == 'demo':
-        demo = Path(__file__).with_name('demo.py')
-        print(getoutput(str(demo)))
+        try:
+            print(run([_DEMO], stdout=PIPE, stderr=STDOUT, text=True).stdout.rstrip("\n"))
+        except OSError as exception:
+            # Interpreter not found or script not executable: the error text, as the shell would print.
+            print(exception)
 
 
 if __name__ == "__main__":
@@ -8,11 +8,15 @@ Setuid Module
 `sudo chmod u+s,+x spython`
 """
 import os
+import pwd
+import shutil
 
+from functools import lru_cache
 from pathlib import Path
 from string import Template
-from subprocess import getoutput
+from subprocess import PIPE
 from subprocess import run
+from subprocess import STDOUT
 
 from icecream import ic
 from mproject import EnvBuilder
@@ -23,8 +27,9 @@ ${filename} = Path("/tmp/${filename}")
 ${filename}.touch()
 print(${filename}.owner())
 """)
+scripts = {name: template.substitute(filename=name) for name in ("heredoc", "module", "pipe", "script")}
+etc_profile = Path("/etc/profile")
 tmp = Path('/tmp/setuid')
-tmp.mkdir(exist_ok=True)
 
 
 def create():
@@ -33,25 +38,39 @@ def create():
     file = tmp / name
 
     EnvBuilder(env_dir=file)
-    ic(file.owner())
-    run(["sudo", "rm", "-rf", file])
+    ic(owner(file))
+    return file
 
 
 def module():
     name = ic(module.__name__)
     file = tmp / f"{name}.py"
 
-    file.write_text(template.substitute(filename=name))
+    file.write_text(scripts[name])
 
     os.environ["PYTHONPATH"] = str(tmp)
-    ic(getoutput(f"spython -m {name}"))
+    ic(output("spython", "-m", name))
 
     run(["sudo", "chown", "501:20", file])
-    ic(getoutput(f"spython -m {name}"))
+    ic(output("spython", "-m", name))
 
     run(["sudo", "chmod", "+x", file])
-    ic(getoutput(f"spython -m {name}"))
-    ic(getoutput(f"{file}"))
+    ic(output("spython", "-m", name))
+    ic(output(file))
+
+
+def output(*args, stdin=None):
+    """Output of command as :func:`subprocess.getoutput` without a shell, stdin as input if provided."""
+    try:
+        return run(args, input=stdin, stdout=PIPE, stderr=STDOUT, text=True).stdout.rstrip("\n")
+    except OSError as exception:
+        # Command not found or not executable: the error text, as the shell would print.
+        return str(exception)
+
+
+def owner(file):
+    """Owner name of file as :meth:`pathlib.Path.owner`, one stat and a cached user lookup."""
+    return user(file.stat().st_uid)
 
 
 def path():
@@ -59,18 +78,18 @@ def path():
 
     file = tmp / name
     file.touch()
-    ic(file.owner())
+    ic(owner(file))
     file.unlink()
 
     file.mkdir(exist_ok=True)
-    ic(file.owner())
-    run(["sudo", "rm", "-rf", file])
+    ic(owner(file))
+    return file
 
 
 def profile():
     ic(profile.__name__)
-    file = Path("/etc/profile")
-    if os.access(file, os.W_OK, effective_ids=True):
+    file = etc_profile
+    if writable(file, os.geteuid()):
         with file.open(mode='a') as fd:
             fd.write("")
         ic(f"{file}: updated")
@@ -78,50 +97,75 @@ def profile():
         ic(f"{file}: no write access")
 
 
+def rm(*paths):
+    """Remove paths in-process and with a single `sudo rm -rf` only for the ones with permission denied."""
+    denied = []
+    for file in paths:
+        try:
+            shutil.rmtree(file)
+        except PermissionError:
+            denied.append(file)
+    if denied:
+        run(["sudo", "rm", "-rf", *denied])
+
+
 def spython():
     name = ic(spython.__name__)
 
-    d = dict(filename="pipe")
-    ic(getoutput(f"echo '{template.substitute(d)}' | spython"))
+    ic(output("spython", stdin=scripts["pipe"]))
 
-    d = dict(filename="heredoc")
-    ic(getoutput(f"spython <<<'{template.substitute(d)}'"))
+    ic(output("spython", stdin=scripts["heredoc"]))
 
-    d = dict(filename="script")
-    ic(getoutput(f"spython -c '{template.substitute(d)}'"))
+    ic(output("spython", "-c", scripts["script"]))
 
-    ic(getoutput(f"spython -c 'import os; print(os.getuid()); print(os.geteuid())'"))
+    ic(output("spython", "-c", "import os; print(os.getuid()); print(os.geteuid())"))
+
+
+@lru_cache(maxsize=256)
+def user(uid):
+    """User name for uid, looked up once."""
+    return pwd.getpwuid(uid).pw_name
+
+
+@lru_cache(maxsize=16)
+def writable(path, euid):
+    """Write access with effective ids, cached by euid since the demo switches between the same euids."""
+    return os.access(path, os.W_OK, effective_ids=True)
 
 
 def main():
     ic(os.getuid(), os.getgid(), os.geteuid(), os.getegid())
     module()
-    path()
+    remove = [path()]
     profile()
-    create()
+    remove.append(create())
+    # One sudo at most for the cleanup of path() and create()
+    rm(*remove)
 
 
-ic(os.environ["USER"])
-ic(os.getuid(), os.getgid(), os.geteuid(), os.getegid())
-print()
+if __name__ == "__main__":
+    tmp.mkdir(exist_ok=True)
+    ic(os.environ["USER"])
+    ic(os.getuid(), os.getgid(), os.geteuid(), os.getegid())
+    print()
 
-spython()
-print()
+    spython()
+    print()
 
-main()
-print()
+    main()
+    print()
 
-ic(os.seteuid(501))
-main()
-print()
+    ic(os.seteuid(501))
+    main()
+    print()
 
-ic(os.seteuid(0))
-main()
-print()
+    ic(os.seteuid(0))
+    main()
+    print()
 
-ic(os.seteuid(501))
-main()
-print()
+    ic(os.seteuid(501))
+    main()
+    print()
 
-ic(os.seteuid(0))
-main()
+    ic(os.seteuid(0))
+    main()